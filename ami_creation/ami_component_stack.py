@@ -1,6 +1,38 @@
-from textwrap import dedent
+import hashlib
+import os
+from textwrap import dedent, indent
 
 from aws_cdk import aws_imagebuilder as imagebuilder
+from aws_cdk import aws_s3_assets as s3_assets
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WHEELHOUSE_DIR = "/opt/wheelhouse"
+WHEELHOUSE_VENV_DIR = "/opt/venv"
+WHEELHOUSE_PYTHON_TAG = "cp38"
+# Image Builder rejects inline component data longer than this
+COMPONENT_DATA_MAX_LENGTH = 16000
+
+
+def read_requirements_lock(properties):
+    """
+    Read the requirements lock configured in ``python.requirements.lock``.
+
+    Relative paths are resolved against the project directory. Returns a
+    ``(path, sha256)`` tuple, or ``None`` when no lock is configured.
+    """
+    lock_path = properties.get("python.requirements.lock", "")
+    if not lock_path:
+        return None
+
+    if not os.path.isabs(lock_path):
+        lock_path = os.path.normpath(os.path.join(PROJECT_DIR, lock_path))
+    if not os.path.exists(lock_path):
+        raise FileNotFoundError(f"Requirements lock not found at {lock_path}")
+
+    with open(lock_path, "rb") as file:
+        lock_hash = hashlib.sha256(file.read()).hexdigest()
+    return lock_path, lock_hash
 
 
 class AmiComponentStack:
@@ -10,7 +42,78 @@ class AmiComponentStack:
     ):
         self.scope = scope
 
-    def testing_component(self, properties):
+    def requirements_lock_asset(self, properties):
+        """
+        Upload the configured requirements lock as a CDK asset.
+
+        Returns an ``(asset, sha256)`` tuple, or ``None`` when no lock is configured.
+        """
+        lock = read_requirements_lock(properties)
+        if lock is None:
+            return None
+
+        lock_path, lock_hash = lock
+        return s3_assets.Asset(self.scope, "RequirementsLock", path=lock_path), lock_hash
+
+    def wheelhouse_step(self, properties, requirements_lock):
+        """
+        Build step that bakes a prebuilt wheelhouse and venv into the AMI.
+
+        Wheels are cached under ``s3://<bucket>/packages/wheels/cp38-<arch>/<lock sha256>/``:
+        the first build for a given lock and platform compiles them and uploads
+        the result followed by a ``.complete`` marker, later builds only download
+        it. Instances launched from the AMI can then run
+        ``/opt/venv/bin/pip install --no-index --find-links /opt/wheelhouse`` offline.
+
+        :param requirements_lock: ``(asset, sha256)`` from ``requirements_lock_asset``, or ``None``
+        """
+        if requirements_lock is None:
+            return ""
+
+        lock_asset, lock_hash = requirements_lock
+        wheels_prefix = f"s3://{properties['s3.bucket.name']}/packages/wheels"
+        script = f"""
+#!/bin/bash -xe
+
+sudo apt-get install -y -f python3.8-venv
+sudo mkdir -p {WHEELHOUSE_DIR}
+sudo chown -R ubuntu:ubuntu {WHEELHOUSE_DIR}
+
+aws s3 cp {lock_asset.s3_object_url} {WHEELHOUSE_DIR}/requirements.lock
+
+# Wheels are specific to the interpreter and architecture, so both are part of the cache key
+WHEELS_URI="{wheels_prefix}/{WHEELHOUSE_PYTHON_TAG}-$(uname -m)/{lock_hash}/"
+
+# Fetch the cached wheelhouse for this lock, building and uploading it on a miss.
+# The .complete marker is only written once the upload succeeded, so a partial upload stays a miss.
+if aws s3 ls "${{WHEELS_URI}}.complete"; then
+  aws s3 sync "$WHEELS_URI" {WHEELHOUSE_DIR}/ --exclude .complete
+else
+  python3.8 -mpip wheel -w {WHEELHOUSE_DIR} pip setuptools wheel
+  python3.8 -mpip wheel -w {WHEELHOUSE_DIR} -r {WHEELHOUSE_DIR}/requirements.lock
+  aws s3 sync {WHEELHOUSE_DIR}/ "$WHEELS_URI" --exclude requirements.lock
+  aws s3 cp {WHEELHOUSE_DIR}/requirements.lock "${{WHEELS_URI}}.complete"
+fi
+
+# Pre-install the wheelhouse into a venv, without touching the network.
+# The venv is seeded with the distro pip, which predates manylinux_2_x tags, so upgrade it first.
+sudo python3.8 -m venv {WHEELHOUSE_VENV_DIR}
+sudo {WHEELHOUSE_VENV_DIR}/bin/pip install --no-index --find-links {WHEELHOUSE_DIR} \\
+  --upgrade pip setuptools wheel
+sudo {WHEELHOUSE_VENV_DIR}/bin/pip install --no-index --find-links {WHEELHOUSE_DIR} \\
+  -r {WHEELHOUSE_DIR}/requirements.lock
+sudo chown -R ubuntu:ubuntu {WHEELHOUSE_VENV_DIR} {WHEELHOUSE_DIR}
+"""
+        return f"""
+      - name: pythonWheelhouse
+        action: ExecuteBash
+        inputs:
+          commands:
+            - |
+{indent(script.strip(), " " * 16)}
+"""
+
+    def testing_component(self, properties, requirements_lock=None):
         if properties["environment"] == "Production":
             env = "-p"
         else:
@@ -18,7 +121,7 @@ class AmiComponentStack:
 
         bucket_script = properties["s3.bucket.name"]
 
-        return imagebuilder.CfnComponent(
+        component = imagebuilder.CfnComponent(
             self.scope,
             "MachineComponent",
             name="MachineComponent",
@@ -142,7 +245,15 @@ phases:
                 dpkg -i -E ./amazon-cloudwatch-agent.deb
                 sudo systemctl restart amazon-cloudwatch-agent
 """
-            ),
+            )
+            + self.wheelhouse_step(properties, requirements_lock),
         )
 
+        if len(component.data) > COMPONENT_DATA_MAX_LENGTH:
+            raise ValueError(
+                f"MachineComponent data is {len(component.data)} characters, "
+                f"Image Builder allows at most {COMPONENT_DATA_MAX_LENGTH}."
+            )
+        return component
+
     
\ No newline at end of file
@@ -53,11 +53,12 @@ class AMICreationStack(Stack):
         self.properties = properties
         self.resources = CommonResources(self)
         self.component = AmiComponentStack(self)
+        self.requirements_lock = self.component.requirements_lock_asset(self.properties)
         self.instance_role = self._create_instance_role(self.machine_type)
         self.infra_config = self._create_infrastructure_config(self.machine_type)
         self.dist_config = self._create_distribution_config(self.machine_type)
         if self.machine_type == "Testing":
-            self.custom_component = self.component.testing_component(self.properties)
+            self.custom_component = self.component.testing_component(self.properties, self.requirements_lock)
         if self.machine_type == "Another machine name here":
             self.custom_component = self.component.Another_machine_name_here_component(self.properties) # create another custom component for this machine type
 
@@ -91,6 +92,34 @@ class AMICreationStack(Stack):
         # Add the custom policy to the role
         image_builder_role.add_to_principal_policy(s3_access_policy)
 
+        # Allow the build to fetch the lock, and to look up and upload the wheelhouse it compiles on a cache miss
+        if self.requirements_lock is not None:
+            lock_asset, _ = self.requirements_lock
+            lock_asset.grant_read(image_builder_role)
+            image_builder_role.add_to_principal_policy(
+                iam.PolicyStatement(
+                    effect=iam.Effect.ALLOW,
+                    actions=[
+                        "s3:ListBucket",
+                    ],
+                    resources=[
+                        f"arn:aws:s3:::{self.properties['s3.bucket.name']}",
+                    ],
+                    conditions={"StringLike": {"s3:prefix": ["packages/wheels/*"]}},
+                )
+            )
+            image_builder_role.add_to_principal_policy(
+                iam.PolicyStatement(
+                    effect=iam.Effect.ALLOW,
+                    actions=[
+                        "s3:PutObject",
+                    ],
+                    resources=[
+                        f"arn:aws:s3:::{self.properties['s3.bucket.name']}/packages/wheels/*",
+                    ],
+                )
+            )
+
         # Create an instance profile and add the role to it
         instance_profile = iam.CfnInstanceProfile(
             self,
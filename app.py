@@ -1,6 +1,10 @@
+import cProfile
+import json
 import os
 import sys
-from typing import Dict
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
 
 import aws_cdk as cdk
 import boto3
@@ -9,6 +13,134 @@ from ami_creation.ami_pipeline_stack import AmiPipelineStack
 from ami_creation.ec2_launch_stack import LaunchTemplateStack
 
 
+PROFILE_ENV_VAR = "CDK_SYNTH_PROFILE"
+CPROFILE_ENV_VAR = "CDK_SYNTH_CPROFILE"
+PROFILE_TRACE_FILE = "synth-profile.json"
+PROFILE_CPROFILE_FILE = "synth-profile.prof"
+
+
+def _is_enabled(context_value, env_var: str) -> bool:
+    value = context_value if context_value is not None else os.environ.get(env_var, "")
+    return str(value).strip().lower() in ("true", "1", "yes")
+
+
+class SynthProfiler:
+    """
+    Opt-in timing trace for the synth process.
+
+    Records phases, stack constructors and boto3 API calls as Chrome trace
+    events (viewable in chrome://tracing or Perfetto). When disabled every
+    method is a no-op so the normal synth path is unaffected.
+    """
+
+    def __init__(self, enabled: bool = False, use_cprofile: bool = False):
+        self.enabled = enabled
+        self.events: List[Dict] = []
+        self.api_calls: Dict[str, Dict] = {}
+        self._origin = time.perf_counter_ns()
+        self._cprofile = cProfile.Profile() if enabled and use_cprofile else None
+        if self._cprofile:
+            self._cprofile.enable()
+
+    @classmethod
+    def from_app(cls, app) -> "SynthProfiler":
+        enabled = _is_enabled(app.node.try_get_context("profile"), PROFILE_ENV_VAR)
+        use_cprofile = _is_enabled(app.node.try_get_context("profile_cprofile"), CPROFILE_ENV_VAR)
+        return cls(enabled=enabled, use_cprofile=use_cprofile)
+
+    def _now_us(self) -> float:
+        return (time.perf_counter_ns() - self._origin) / 1000
+
+    def _add_event(self, name: str, category: str, start_us: float, args: Optional[Dict] = None):
+        self.events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start_us,
+                "dur": self._now_us() - start_us,
+                "pid": os.getpid(),
+                "tid": 0,
+                "args": args or {},
+            }
+        )
+
+    @contextmanager
+    def phase(self, name: str, category: str = "phase"):
+        if not self.enabled:
+            yield
+            return
+        start_us = self._now_us()
+        try:
+            yield
+        finally:
+            self._add_event(name, category, start_us)
+
+    def stack(self, name: str):
+        return self.phase(name, category="stack")
+
+    def instrument_session(self, session):
+        """Register boto3 event hooks to count and time every AWS API call."""
+        if not self.enabled:
+            return
+        # Run ahead of handlers that short-circuit the request (e.g. botocore's Stubber) so every call is timed
+        session.events.register_first("before-call.*.*", self._before_api_call)
+        session.events.register("after-call.*.*", self._after_api_call)
+        session.events.register("after-call-error.*.*", self._after_api_call_error)
+
+    def _before_api_call(self, model, context, **kwargs):
+        # after-call-error does not receive the operation model, so keep the name alongside the start time
+        context["synth_profile_call"] = (f"{model.service_model.service_name}.{model.name}", self._now_us())
+
+    def _after_api_call(self, context, http_response, parsed, **kwargs):
+        status_code = getattr(http_response, "status_code", None)
+        error = None
+        if status_code is not None and status_code >= 300:
+            error = parsed.get("Error", {}).get("Code", "HTTP" + str(status_code))
+        self._record_api_call(context, {"status_code": status_code, "error": error})
+
+    def _after_api_call_error(self, context, exception, **kwargs):
+        self._record_api_call(context, {"status_code": None, "error": type(exception).__name__})
+
+    def _record_api_call(self, context, args: Dict):
+        call = context.pop("synth_profile_call", None)
+        if call is None:
+            return
+        name, start_us = call
+        self._add_event(name, "aws", start_us, args)
+
+        latency_ms = self.events[-1]["dur"] / 1000
+        stats = self.api_calls.setdefault(name, {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stats["count"] += 1
+        if args["error"]:
+            stats["errors"] += 1
+        stats["total_ms"] += latency_ms
+        stats["max_ms"] = max(stats["max_ms"], latency_ms)
+
+    def write(self, outdir: str):
+        """Write the trace (and cProfile stats, if enabled) next to the cloud assembly directory."""
+        if not self.enabled:
+            return
+        target_dir = os.path.dirname(os.path.abspath(outdir))
+
+        if self._cprofile:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(os.path.join(target_dir, PROFILE_CPROFILE_FILE))
+
+        trace = {
+            "traceEvents": self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "total_ms": self._now_us() / 1000,
+                "aws_api_calls": self.api_calls,
+            },
+        }
+        trace_path = os.path.join(target_dir, PROFILE_TRACE_FILE)
+        with open(trace_path, "w") as file:
+            json.dump(trace, file, indent=2)
+        print(f"Synth profile written to {trace_path}\n", file=sys.stderr)
+
+
 def read_properties_file(environment) -> Dict[str, str]:
     properties = {}
 
@@ -50,42 +182,57 @@ def get_latest_custom_ami(ec2_client, machine_type: str, component_version: str)
 
 def main():
     app = cdk.App()
+    profiler = SynthProfiler.from_app(app)
+    try:
+        synth(app, profiler)
+    finally:
+        profiler.write(app.outdir)
+
 
+def synth(app: cdk.App, profiler: SynthProfiler):
     environment_name = app.node.try_get_context("environment_name")
     if environment_name not in ["staging", "production"]:
         print("Environment must be either 'staging' or 'production'\n")
         sys.exit(1)
 
-    properties = read_properties_file(environment_name)
+    with profiler.phase("read_properties"):
+        properties = read_properties_file(environment_name)
     properties["environment"] = environment_name
 
     env = {"account": properties["aws.account.id"], "region": properties["aws.region"]}
 
-    boto3_session = boto3.session.Session(profile_name=properties["aws.profile"])
-    ec2_client = boto3_session.client("ec2", region_name=properties["aws.region"])
+    with profiler.phase("boto3_session"):
+        boto3_session = boto3.session.Session(profile_name=properties["aws.profile"])
+        profiler.instrument_session(boto3_session)
+        ec2_client = boto3_session.client("ec2", region_name=properties["aws.region"])
 
     stack_name = app.node.try_get_context("stack_name")
 
     # Create stacks
-    create_ami = AMICreationStack(app, "CreateAMI", "Testing", properties, env=env)
+    with profiler.stack("CreateAMI"):
+        create_ami = AMICreationStack(app, "CreateAMI", "Testing", properties, env=env)
 
-    build_ami = AmiPipelineStack(app, "BuildAMI", "Testing", env=env)
+    with profiler.stack("BuildAMI"):
+        build_ami = AmiPipelineStack(app, "BuildAMI", "Testing", env=env)
 
     # For LaunchTemplateStacks, we'll check AMI availability before creating the stack
     if stack_name == "CreateTemplate":
-        custom_ami = get_latest_custom_ami(ec2_client, "Testing", properties["ami.component.version"])
+        with profiler.phase("get_latest_custom_ami"):
+            custom_ami = get_latest_custom_ami(ec2_client, "Testing", properties["ami.component.version"])
         if not custom_ami:
             print("Failed to find required AMI or AMI is not in 'available' state\n")
             sys.exit(1)
-        create_template = LaunchTemplateStack(
-            app, "CreateTemplate", "Testing", properties, custom_ami["ImageId"], env=env
-        )
+        with profiler.stack("CreateTemplate"):
+            create_template = LaunchTemplateStack(
+                app, "CreateTemplate", "Testing", properties, custom_ami["ImageId"], env=env
+            )
         create_template.add_dependency(build_ami)
 
     # Define dependencies
     build_ami.add_dependency(create_ami)
 
-    app.synth()
+    with profiler.phase("app.synth"):
+        app.synth()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+import hashlib
+import os
+
+import aws_cdk as cdk
+import pytest
+import yaml
+from aws_cdk import assertions
+
+from ami_creation import ami_component_stack
+from ami_creation.ami_component_stack import PROJECT_DIR, AmiComponentStack, read_requirements_lock
+from ami_creation.ami_creation_stack import AMICreationStack
+
+LOCK_CONTENTS = "# pinned with pip-compile\nnumpy==1.24.4 \\\n    --hash=sha256:abc\n\nrequests==2.31.0\n"
+
+
+def make_properties(lock_path=""):
+    return {
+        "environment": "staging",
+        "aws.account.id": "123456789012",
+        "aws.region": "us-east-1",
+        "ami.parent.image": "arn:aws:imagebuilder:us-east-1:aws:image/ubuntu-server-20-lts-x86/x.x.x",
+        "ami.component.version": "1.0.1",
+        "subnet.private.id": "subnet-123",
+        "sg.id": "sg-123",
+        "s3.bucket.name": "packages-bucket",
+        "python.requirements.lock": lock_path,
+    }
+
+
+def render_component(properties):
+    stack = cdk.Stack(cdk.App(), "Component", env={"account": "123456789012", "region": "us-east-1"})
+    component = AmiComponentStack(stack)
+    return component.testing_component(properties, component.requirements_lock_asset(properties)).data
+
+
+@pytest.fixture
+def lock_file(tmp_path):
+    path = tmp_path / "requirements.lock"
+    path.write_text(LOCK_CONTENTS)
+    return path
+
+
+def test_read_requirements_lock_unset():
+    assert read_requirements_lock(make_properties()) is None
+    assert read_requirements_lock({}) is None
+
+
+def test_read_requirements_lock_absolute_and_relative(lock_file):
+    expected = (str(lock_file), hashlib.sha256(LOCK_CONTENTS.encode("utf-8")).hexdigest())
+
+    assert read_requirements_lock(make_properties(str(lock_file))) == expected
+    assert read_requirements_lock(make_properties(os.path.relpath(lock_file, PROJECT_DIR))) == expected
+
+
+def test_read_requirements_lock_missing(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        read_requirements_lock(make_properties(str(tmp_path / "missing.lock")))
+
+
+def test_wheelhouse_step_renders_after_custom_setup(lock_file):
+    data = yaml.safe_load(render_component(make_properties(str(lock_file))))
+
+    steps = data["phases"][0]["steps"]
+    assert [step["name"] for step in steps] == ["customSetup", "pythonWheelhouse"]
+
+    script = steps[1]["inputs"]["commands"][0]
+    assert "numpy" not in script
+    assert "aws s3 cp s3://cdk-hnb659fds-assets-123456789012-us-east-1/" in script
+    lock_hash = hashlib.sha256(LOCK_CONTENTS.encode("utf-8")).hexdigest()
+    assert f'WHEELS_URI="s3://packages-bucket/packages/wheels/cp38-$(uname -m)/{lock_hash}/"' in script
+    assert 'aws s3 ls "${WHEELS_URI}.complete"' in script
+
+
+def test_component_data_length_is_checked(lock_file, monkeypatch):
+    monkeypatch.setattr(ami_component_stack, "COMPONENT_DATA_MAX_LENGTH", 1000)
+
+    with pytest.raises(ValueError, match="Image Builder allows at most 1000"):
+        render_component(make_properties(str(lock_file)))
+
+
+def test_component_unchanged_without_lock():
+    properties = make_properties()
+    without_key = dict(properties)
+    del without_key["python.requirements.lock"]
+
+    data = render_component(properties)
+    assert data == render_component(without_key)
+    assert "pythonWheelhouse" not in data
+
+
+def test_instance_role_can_list_and_upload_wheels(lock_file):
+    stack = AMICreationStack(cdk.App(), "CreateAMI", "Testing", make_properties(str(lock_file)))
+
+    assertions.Template.from_stack(stack).has_resource_properties(
+        "AWS::IAM::Policy",
+        {
+            "PolicyDocument": {
+                "Statement": assertions.Match.array_with(
+                    [
+                        {
+                            "Action": "s3:ListBucket",
+                            "Condition": {"StringLike": {"s3:prefix": ["packages/wheels/*"]}},
+                            "Effect": "Allow",
+                            "Resource": "arn:aws:s3:::packages-bucket",
+                        },
+                        {
+                            "Action": "s3:PutObject",
+                            "Effect": "Allow",
+                            "Resource": "arn:aws:s3:::packages-bucket/packages/wheels/*",
+                        },
+                    ]
+                )
+            }
+        },
+    )
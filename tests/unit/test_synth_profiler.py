@@ -0,0 +1,126 @@
+import json
+import os
+
+import boto3
+import botocore.config
+import botocore.exceptions
+import pytest
+from botocore.stub import Stubber
+
+from app import PROFILE_CPROFILE_FILE, PROFILE_ENV_VAR, PROFILE_TRACE_FILE, SynthProfiler, _is_enabled
+
+
+def make_session(profiler):
+    session = boto3.session.Session(
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+        region_name="us-east-1",
+    )
+    profiler.instrument_session(session)
+    return session
+
+
+def test_is_enabled_prefers_context_over_env(monkeypatch):
+    monkeypatch.setenv(PROFILE_ENV_VAR, "1")
+    assert _is_enabled(None, PROFILE_ENV_VAR)
+    assert not _is_enabled("false", PROFILE_ENV_VAR)
+
+    monkeypatch.delenv(PROFILE_ENV_VAR)
+    assert not _is_enabled(None, PROFILE_ENV_VAR)
+    assert _is_enabled("true", PROFILE_ENV_VAR)
+    assert _is_enabled(True, PROFILE_ENV_VAR)
+
+
+def test_phase_records_chrome_trace_event():
+    profiler = SynthProfiler(enabled=True)
+
+    with profiler.phase("read_properties"):
+        pass
+    with profiler.stack("CreateAMI"):
+        pass
+
+    assert [(event["name"], event["cat"]) for event in profiler.events] == [
+        ("read_properties", "phase"),
+        ("CreateAMI", "stack"),
+    ]
+    event = profiler.events[0]
+    assert event["ph"] == "X"
+    assert event["pid"] == os.getpid()
+    assert event["ts"] >= 0
+    assert event["dur"] >= 0
+
+
+def test_instrument_session_counts_describe_images():
+    profiler = SynthProfiler(enabled=True)
+    ec2_client = make_session(profiler).client("ec2")
+
+    with Stubber(ec2_client) as stubber:
+        stubber.add_response("describe_images", {"Images": []})
+        stubber.add_client_error("describe_images", service_error_code="RequestLimitExceeded", http_status_code=503)
+
+        ec2_client.describe_images(Owners=["self"])
+        with pytest.raises(botocore.exceptions.ClientError):
+            ec2_client.describe_images(Owners=["self"])
+
+    stats = profiler.api_calls["ec2.DescribeImages"]
+    assert stats["count"] == 2
+    assert stats["errors"] == 1
+    assert stats["max_ms"] <= stats["total_ms"]
+
+    events = [event for event in profiler.events if event["cat"] == "aws"]
+    assert [event["args"] for event in events] == [
+        {"status_code": 200, "error": None},
+        {"status_code": 503, "error": "RequestLimitExceeded"},
+    ]
+
+
+def test_instrument_session_records_failed_calls():
+    profiler = SynthProfiler(enabled=True)
+    ec2_client = make_session(profiler).client(
+        "ec2",
+        endpoint_url="http://127.0.0.1:1",
+        config=botocore.config.Config(retries={"max_attempts": 0}, connect_timeout=1),
+    )
+    contexts = []
+    ec2_client.meta.events.register("after-call-error", lambda context, **kwargs: contexts.append(context))
+
+    with pytest.raises(botocore.exceptions.EndpointConnectionError):
+        ec2_client.describe_images(Owners=["self"])
+
+    assert profiler.api_calls["ec2.DescribeImages"]["errors"] == 1
+    assert profiler.events[-1]["args"]["error"] == "EndpointConnectionError"
+    assert "synth_profile_call" not in contexts[0]
+
+
+def test_write_puts_trace_next_to_outdir(tmp_path):
+    profiler = SynthProfiler(enabled=True, use_cprofile=True)
+    with profiler.phase("app.synth"):
+        pass
+    profiler.api_calls["ec2.DescribeImages"] = {"count": 1, "errors": 0, "total_ms": 1.0, "max_ms": 1.0}
+
+    profiler.write(str(tmp_path / "cdk.out"))
+
+    with open(tmp_path / PROFILE_TRACE_FILE) as file:
+        trace = json.load(file)
+    assert trace["displayTimeUnit"] == "ms"
+    assert [event["name"] for event in trace["traceEvents"]] == ["app.synth"]
+    assert trace["otherData"]["aws_api_calls"]["ec2.DescribeImages"]["count"] == 1
+    assert trace["otherData"]["total_ms"] > 0
+    assert (tmp_path / PROFILE_CPROFILE_FILE).exists()
+
+
+def test_disabled_profiler_is_a_noop(tmp_path):
+    profiler = SynthProfiler(enabled=False, use_cprofile=True)
+    ec2_client = make_session(profiler).client("ec2")
+
+    with profiler.phase("read_properties"):
+        pass
+    with Stubber(ec2_client) as stubber:
+        stubber.add_response("describe_images", {"Images": []})
+        ec2_client.describe_images(Owners=["self"])
+
+    profiler.write(str(tmp_path / "cdk.out"))
+
+    assert profiler.events == []
+    assert profiler.api_calls == {}
+    assert list(tmp_path.iterdir()) == []